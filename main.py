@@ -1,9 +1,36 @@
 import pandas as pd
 import sys
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, groupby
+from operator import attrgetter
 
+from parse_txt import PortRow, parse_txt
 
-def read_switch_config_from_excel(file_path: str, sheet_name: str = 'Sheet1') -> pd.DataFrame | None:
+try:
+    # xlsxwriter 為可選套件，用於以串流方式匯出 Excel 報告，未安裝時改用 openpyxl
+    import xlsxwriter
+    _HAS_XLSXWRITER = True
+except ImportError:
+    _HAS_XLSXWRITER = False
+
+# 報告的欄位順序
+REPORT_COLUMNS = ['Port Index', 'Alias', 'WWPN', 'Zone Name']
+
+# 檔案數達到此值才使用多個行程平行解析，檔案太少時行程的啟動成本高於平行化的效益
+_PARALLEL_MIN_FILES = 4
+# 批次模式預設 alias 前綴的最大長度。Brocade 的 alias 名稱最長 64 字元，
+# 需保留空間給重複前綴的序號與 '_Port_<Port Index>'
+_ALIAS_PREFIX_MAX_LEN = 40
+
+# Brocade 指令的格式化函式，以 C 實作的 %-格式化取代逐次的 f-string
+# 格式: alicreate "alias_name", "wwpn1;wwpn2;..."
+_ALI_TPL = 'alicreate "%s", "%s"'.__mod__
+# 格式: zonecreate "zone_name", "alias1;alias2;..."
+_ZONE_TPL = 'zonecreate "%s", "%s"'.__mod__
+
+def read_switch_config_from_excel(file_path: str, sheet_name: str = 'Sheet1') -> list[PortRow] | None:
     """
     從 Excel 檔案中讀取交換器連接埠設定。
 
@@ -12,20 +39,25 @@ def read_switch_config_from_excel(file_path: str, sheet_name: str = 'Sheet1') ->
         sheet_name (str): 要讀取的工作表名稱。
 
     Returns:
-        pd.DataFrame | None: 包含設定資料的 DataFrame，如果發生錯誤則返回 None。
+        list[PortRow] | None: 包含設定資料的 PortRow 列表，如果發生錯誤則返回 None。
     """
     try:
-        df = pd.read_excel(file_path, sheet_name=sheet_name, dtype=str).fillna('')
         # 'Zone Name' 是可選欄位
-        required_columns = ['switch port name', 'switch port wwpn'] 
+        required_columns = ['switch port name', 'switch port wwpn']
+        used_columns = {*required_columns, 'Zone Name'}
+        # 以 openpyxl 的唯讀模式讀取，逐列串流解析而不建立完整的儲存格物件 (需要 pandas >= 1.5)，
+        # 並只解析需要的欄位
+        df = pd.read_excel(file_path, sheet_name=sheet_name, dtype=str, engine='openpyxl',
+                           engine_kwargs={'read_only': True, 'data_only': True},
+                           usecols=lambda col: col in used_columns).fillna('')
         if not all(col in df.columns for col in required_columns):
             print(f"錯誤：Excel 檔案 '{file_path}' 必須包含以下欄位：{', '.join(required_columns)}", file=sys.stderr)
             return None
-        # 統一欄位名稱以便後續處理
-        df.rename(columns={'switch port name': 'Alias', 'switch port wwpn': 'WWPN', 'Zone Name': 'Zone Name'}, inplace=True)
-        # 為報告增加一個空的 Port Index 欄位
-        df['Port Index'] = ''
-        return df
+        aliases = df['switch port name'].str.strip().tolist()
+        wwpns = df['switch port wwpn'].str.strip().tolist()
+        zones = df['Zone Name'].str.strip().tolist() if 'Zone Name' in df.columns else [''] * len(df)
+        # Excel 中沒有 Port Index，以空字串填入
+        return [PortRow('', alias, wwpn, zone) for alias, wwpn, zone in zip(aliases, wwpns, zones)]
     except FileNotFoundError:
         print(f"錯誤：找不到檔案 '{file_path}'", file=sys.stderr)
         return None
@@ -33,202 +65,124 @@ def read_switch_config_from_excel(file_path: str, sheet_name: str = 'Sheet1') ->
         print(f"讀取 Excel 檔案時發生錯誤：{e}", file=sys.stderr)
         return None
 
-def parse_aliases_from_txt(file_path: str) -> dict[str, str]:
+def parse_txt_batch(file_paths: list[str]) -> tuple[dict[str, str], dict[str, str], list[PortRow] | None]:
     """
-    從 zoneshow 的文字輸出中解析已存在的 alias。
-
-    Args:
-        file_path (str): 包含 'zoneshow' 輸出的文字檔案路徑。
+    解析多個交換器的 zoneshow/switchshow 文字輸出 (例如每台 fabric 交換器一個檔案)，並合併結果。
 
-    Returns:
-        dict[str, str]: 一個 WWPN 到 alias 名稱的對應字典。
-    """
-    wwpn_regex = re.compile(r'([0-9a-f]{2}:){7}[0-9a-f]{2}')
-    alias_map = {}
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            last_alias_name = None
-            for line in f:
-                clean_line = line.strip()
-                if clean_line.startswith("alias:"):
-                    # 提取 alias name
-                    parts = clean_line.split(":", 1)
-                    if len(parts) > 1:
-                        last_alias_name = parts[1].strip()
-                elif last_alias_name:
-                    # 如果上一行是 alias name，這一行應該是 WWPN
-                    match = wwpn_regex.search(clean_line)
-                    if match:
-                        alias_map[match.group(0).lower()] = last_alias_name
-                        last_alias_name = None # 處理完畢，重置以尋找下一個 alias
-    except Exception as e:
-        print(f"警告：解析既有 alias 時發生錯誤: {e}", file=sys.stderr)
-    return alias_map
-    
-def parse_zones_from_txt(file_path: str) -> dict[str, str]:
-    """
-    從 zoneshow 的文字輸出中解析已存在的 zone 和其成員 (alias)。
-
-    Args:
-        file_path (str): 包含 'zoneshow' 輸出的文字檔案路徑。
-
-    Returns:
-        dict[str, str]: 一個 alias 到 zone 名稱的對應字典。
-    """
-    alias_to_zone_map = {}
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            current_zone_name = None
-            in_defined_config = False
-            for line in f:
-                clean_line = line.strip()
-                if clean_line.startswith("Defined configuration:"):
-                    in_defined_config = True
-                    continue
-                
-                if not in_defined_config or not clean_line:
-                    continue
-
-                if clean_line.startswith("zone:"):
-                    parts = clean_line.split(":", 1)
-                    current_zone_name = parts[1].strip() if len(parts) > 1 else None
-                elif current_zone_name:
-                    # 這一行是 zone 的成員
-                    members = [member.strip() for member in clean_line.split(';') if member.strip()]
-                    for member_alias in members:
-                        alias_to_zone_map[member_alias] = current_zone_name
-                    current_zone_name = None # 處理完一個 zone 的成員後立即重置
-    except Exception as e:
-        print(f"警告：解析既有 zone 時發生錯誤: {e}", file=sys.stderr)
-    return alias_to_zone_map
-    
-def parse_switchshow_from_txt(file_path: str, existing_aliases: dict[str, str], existing_zones: dict[str, str]) -> pd.DataFrame | None:
-    """
-    從 switchshow 的文字輸出中解析 Port ID 和 WWPN。
+    Brocade 的 zoning 是整個 fabric 共用的，因此合併後會以所有檔案的 alias 與 zone 重新對應每個連接埠，
+    沒有別名的連接埠以檔名為前綴命名 (例如 'bq_3F_switch_info_Port_4')，避免不同交換器的相同
+    Port Index 產生衝突的 alias；同一個 WWPN 出現在多個檔案時只保留第一筆並印出警告。
 
     Args:
-        file_path (str): 包含 'switchshow' 輸出的文字檔案路徑。
-        existing_aliases (dict[str, str]): 已存在的 WWPN 到 alias 名稱的對應字典。
-        existing_zones (dict[str, str]): 已存在的 alias 到 zone 名稱的對應字典。
+        file_paths (list[str]): 文字檔案路徑的列表。
 
     Returns:
-        pd.DataFrame | None: 包含 'switch port name' 和 'switch port wwpn' 的 DataFrame，
-                             如果發生錯誤或找不到資料則返回 None。
-    """
-    # 用於匹配 WWPN 的正規表示式 (例如: 10:00:00:00:c9:aa:bb:cc)
-    wwpn_regex = re.compile(r'([0-9a-f]{2}:){7}[0-9a-f]{2}')
-    port_data = []
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            # 狀態旗標，標示是否進入 switchshow 的內容區塊
-            in_switchshow_section = False
-            for line in f:
-                line = line.strip()
-                
-                # 找到 switchshow 輸出的標頭，開始解析
-                if line.startswith("Index Port Address"):
-                    in_switchshow_section = True
-                    continue
-                
-                # 如果不在 switchshow 區塊，就跳過
-                if not in_switchshow_section:
-                    continue
-
-                # 如果遇到下一個命令提示符，表示 switchshow 區塊結束
-                if "admin>" in line:
-                    in_switchshow_section = False
-                    break
-
-                # 尋找包含 WWPN 和 'F-Port' 的行
-                match = wwpn_regex.search(line)
-                if match and 'F-Port' in line and 'Online' in line:
-                    wwpn = match.group(0).lower()
-                    columns = line.split()
-                    if len(columns) > 1 and columns[0].isdigit():
-                        port_index = columns[0]
-                        # 檢查此 WWPN 是否已有別名，若無則使用預設名稱
-                        alias_name = existing_aliases.get(wwpn, f"Port_{port_index}")
-                        # 檢查此 alias 是否屬於某個 zone
-                        zone_name = existing_zones.get(alias_name, '') # 如果找不到則為空
-                        port_data.append({'Port Index': port_index, 'Alias': alias_name, 'WWPN': wwpn, 'Zone Name': zone_name})
-
-        return pd.DataFrame(port_data) if port_data else None
-    except FileNotFoundError:
-        print(f"錯誤：找不到檔案 '{file_path}'", file=sys.stderr)
-        return None
-    except Exception as e:
-        print(f"讀取或解析 TXT 檔案時發生錯誤：{e}", file=sys.stderr)
-        return None
+        tuple[dict[str, str], dict[str, str], list[PortRow] | None]:
+            合併後的 WWPN 到 alias 名稱對應字典、alias 到 zone 名稱對應字典，
+            以及所有檔案的 PortRow 列表 (如果都找不到資料則為 None)。
+    """
+    # 各檔案的解析互不相依且受 GIL 限制，檔案夠多時以多個行程平行處理
+    if len(file_paths) >= _PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(parse_txt, file_paths))
+    else:
+        results = [parse_txt(file_path) for file_path in file_paths]
 
-def generate_brocade_alias_commands(config_df: pd.DataFrame) -> list[str]:
-    """
-    從 DataFrame 產生 Brocade 'alicreate' 指令。
+    # 與連接埠相同，對應有衝突時以排在前面的檔案為準
+    alias_map = {}
+    alias_to_zone_map = {}
+    for file_aliases, file_zones, _ in reversed(results):
+        alias_map.update(file_aliases)
+        alias_to_zone_map.update(file_zones)
+
+    rows = []
+    # WWPN 到第一次出現的檔案路徑，用於過濾重複的連接埠
+    seen_wwpns: dict[str, str] = {}
+    used_prefixes: set[str] = set()
+    for file_number, (file_path, (_, _, file_rows)) in enumerate(zip(file_paths, results), start=1):
+        if not file_rows:
+            continue
+        # 以檔名作為預設 alias 的前綴，並只保留 alias 名稱允許的字元
+        prefix = re.sub(r'\W', '_', os.path.splitext(os.path.basename(file_path))[0], flags=re.ASCII)
+        if not prefix.strip('_'):
+            # 檔名中沒有可用的字元 (例如全為中文)，改以檔案的順序命名
+            prefix = f"SW{file_number}"
+        elif not prefix[0].isalpha():
+            # alias 名稱必須以英文字母開頭
+            prefix = f"SW_{prefix}"
+        prefix = prefix[:_ALIAS_PREFIX_MAX_LEN]
+        base_prefix, suffix = prefix, 2
+        while prefix in used_prefixes:
+            prefix = f"{base_prefix}_{suffix}"
+            suffix += 1
+        used_prefixes.add(prefix)
+
+        for row in file_rows:
+            first_path = seen_wwpns.get(row.wwpn)
+            if first_path is not None:
+                print(f"警告：WWPN '{row.wwpn}' 同時出現在 '{first_path}' 與 '{file_path}'，已略過後者。", file=sys.stderr)
+                continue
+            seen_wwpns[row.wwpn] = file_path
+            alias_name = alias_map.get(row.wwpn) or f"{prefix}_Port_{row.port_index}"
+            rows.append(PortRow(row.port_index, alias_name, row.wwpn, alias_to_zone_map.get(alias_name, '')))
+    return alias_map, alias_to_zone_map, (rows or None)
+
+def generate_brocade_alias_commands(rows: list[PortRow]) -> list[str]:
+    """
+    從連接埠資料產生 Brocade 'alicreate' 指令。
 
     Args:
-        config_df (pd.DataFrame): 包含 'Alias' 和 'WWPN' 的 DataFrame。
+        rows (list[PortRow]): 連接埠資料的 PortRow 列表。
 
     Returns:
         list[str]: 一個包含 'alicreate' 指令字串的列表。
     """
-    commands = []
-    # 迭代 DataFrame 的每一行
-    for index, row in config_df.iterrows():
-        alias_name = row['Alias'].strip()
-        wwpn = row['WWPN'].strip()
-
-        # 確保 alias_name 和 wwpn 都不為空
-        if alias_name and wwpn:
-            # 組成 Brocade alicreate 指令
-            # 格式: alicreate "alias_name", "wwpn1;wwpn2;..."
-            command = f'alicreate "{alias_name}", "{wwpn}"'
-            commands.append(command)
-        else:
-            print(f"警告：第 {index + 2} 行的資料不完整，已跳過。Name: '{alias_name}', WWPN: '{wwpn}'", file=sys.stderr)
-            
-    return commands
+    # 確保 alias 和 wwpn 都不為空，不完整的資料列印出警告後跳過
+    for index, row in enumerate(rows):
+        if not (row.alias and row.wwpn):
+            print(f"警告：第 {index + 2} 行的資料不完整，已跳過。Name: '{row.alias}', WWPN: '{row.wwpn}'", file=sys.stderr)
+
+    # 組成 Brocade alicreate 指令
+    return list(map(_ALI_TPL, ((row.alias, row.wwpn) for row in rows if row.alias and row.wwpn)))
 
-def generate_brocade_zone_commands(config_df: pd.DataFrame) -> list[str]:
+def generate_brocade_zone_commands(rows: list[PortRow]) -> list[str]:
     """
-    從 DataFrame 產生 Brocade 'zonecreate' 指令。
+    從連接埠資料產生 Brocade 'zonecreate' 指令。
 
     Args:
-        config_df (pd.DataFrame): 包含 'Alias' 和 'Zone Name' 的 DataFrame。
+        rows (list[PortRow]): 連接埠資料的 PortRow 列表。
 
     Returns:
         list[str]: 一個包含 'zonecreate' 指令字串的列表。
     """
-    commands = []
-    # 按 'Zone Name' 分組，並過濾掉沒有 Zone Name 的資料
-    zoned_df = config_df[config_df['Zone Name'].notna() & (config_df['Zone Name'] != '')]
-    
-    if zoned_df.empty:
-        return commands
-
-    for zone_name, group in zoned_df.groupby('Zone Name'):
-        # 取得該 zone 的所有 alias 成員
-        members = group['Alias'].tolist()
-        members_str = ";".join(members)
-        command = f'zonecreate "{zone_name}", "{members_str}"'
-        commands.append(command)
-        
-    return commands
+    # 過濾掉沒有 Zone Name 的資料，並依 zone 名稱排序後分組 (排序為穩定排序，成員保持原本順序)
+    zone_key = attrgetter('zone')
+    zoned_rows = sorted((row for row in rows if row.zone), key=zone_key)
+    return [_ZONE_TPL((zone_name, ";".join([row.alias for row in group])))
+            for zone_name, group in groupby(zoned_rows, key=zone_key)]
 
-def export_to_excel(report_df: pd.DataFrame, file_path: str):
+def export_to_excel(rows: list[PortRow], file_path: str):
     """
-    將 DataFrame 匯出成 Excel 報告。
+    將連接埠資料匯出成 Excel 報告。
 
     Args:
-        report_df (pd.DataFrame): 要匯出的資料。
+        rows (list[PortRow]): 要匯出的資料。
         file_path (str): 匯出的 Excel 檔案路徑。
     """
     try:
-        # 確保報告的欄位順序是固定的
-        report_columns = ['Port Index', 'Alias', 'WWPN', 'Zone Name']
-        # 過濾掉不存在的欄位，以防萬一
-        report_df_ordered = report_df[[col for col in report_columns if col in report_df.columns]]
-        report_df_ordered.to_excel(file_path, index=False, engine='openpyxl')
+        if _HAS_XLSXWRITER:
+            # 以 xlsxwriter 的 constant_memory 模式逐列寫入磁碟，不需在記憶體中建立整個活頁簿。
+            # constant_memory 只能依列的順序寫入，因此直接以 write_row 逐列寫入
+            # 關閉字串自動轉為公式或超連結，讓報告與 openpyxl 匯出時一樣只包含文字
+            options = {'constant_memory': True, 'strings_to_formulas': False, 'strings_to_urls': False}
+            with xlsxwriter.Workbook(file_path, options) as workbook:
+                worksheet = workbook.add_worksheet('Sheet1')
+                worksheet.write_row(0, 0, REPORT_COLUMNS)
+                for row_index, row in enumerate(rows, start=1):
+                    worksheet.write_row(row_index, 0, row)
+        else:
+            # 只有在匯出時才建立 DataFrame，確保報告的欄位順序是固定的
+            pd.DataFrame(rows, columns=REPORT_COLUMNS).to_excel(file_path, index=False, engine='openpyxl')
         print(f"報告已成功儲存至 '{file_path}'")
     except Exception as e:
         print(f"錯誤：無法匯出 Excel 報告 '{file_path}': {e}", file=sys.stderr)
@@ -245,6 +199,12 @@ def main():
     # 選擇二：從 switchshow 的 txt 檔案讀取
     source_mode = "txt"
     source_file = 'bq_3F_switch_info.txt'
+    # 批次模式使用的檔案列表，預設只包含 source_file
+    source_files = [source_file]
+
+    # 選擇三：一次讀取多台交換器的 txt 檔案
+    # source_mode = "batch"
+    # source_files = ['bq_3F_switch_info.txt', 'bq_4F_switch_info.txt']
     # --------------------
 
     report_file = 'san_port_report.xlsx'
@@ -255,12 +215,10 @@ def main():
     if source_mode == "excel":
         config_data = read_switch_config_from_excel(source_file)
     elif source_mode == "txt":
-        # 1a. 從 txt 檔案中解析出已存在的 alias
-        existing_aliases = parse_aliases_from_txt(source_file)
-        # 1b. 從 txt 檔案中解析出已存在的 zone
-        existing_zones = parse_zones_from_txt(source_file)
-        # 1c. 解析 switchshow，並傳入已存在的 alias 和 zone 資訊
-        config_data = parse_switchshow_from_txt(source_file, existing_aliases, existing_zones)
+        # 單次讀取 txt 檔案，同時解析已存在的 alias、zone 與 switchshow 的連接埠資料
+        existing_aliases, existing_zones, config_data = parse_txt(source_file)
+    elif source_mode == "batch":
+        existing_aliases, existing_zones, config_data = parse_txt_batch(source_files)
     else:
         print(f"錯誤：不支援的來源模式 '{source_mode}'", file=sys.stderr)
         config_data = None
@@ -271,21 +229,16 @@ def main():
         # 3. 產生 Zone 指令
         zone_commands = generate_brocade_zone_commands(config_data)
 
-        # 合併所有指令
-        switch_commands = alias_commands + zone_commands
-
-        if switch_commands:
-            # 4. 在螢幕上印出指令
+        if alias_commands or zone_commands:
+            # 4. 在螢幕上印出指令 (以 chain 串接，不另外合併成新的列表)
             print("--- 產生的交換器指令 ---")
-            for cmd in switch_commands:
-                print(cmd)
+            print("\n".join(chain(alias_commands, zone_commands)))
             print("--------------------------")
 
             # 4. 將指令儲存到檔案
             try:
                 with open(output_file, 'w', encoding='utf-8') as f:
-                    for cmd in switch_commands:
-                        f.write(cmd + '\n')
+                    f.writelines(f"{cmd}\n" for cmd in chain(alias_commands, zone_commands))
                 print(f"\n指令已成功儲存至 '{output_file}'")
             except IOError as e:
                 print(f"錯誤：無法寫入檔案 '{output_file}': {e}", file=sys.stderr)
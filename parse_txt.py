@@ -0,0 +1,119 @@
+# 解析 zoneshow/switchshow 文字輸出的熱點迴圈。此模組已完整標註型別，可選擇以 mypyc 編譯成原生擴充模組：
+#     mypyc parse_txt.py
+# 編譯後 main.py 的 import 會自動載入編譯版本，未編譯時則以一般 Python 執行。
+import sys
+import os
+import re
+import mmap
+from typing import NamedTuple
+
+class PortRow(NamedTuple):
+    """
+    一個交換器連接埠的設定資料，欄位依序對應報告的 'Port Index'、'Alias'、'WWPN'、'Zone Name'。
+    """
+    port_index: str
+    alias: str
+    wwpn: str
+    zone: str
+
+# 用於匹配 WWPN 的正規表示式 (例如: 10:00:00:00:c9:aa:bb:cc)
+_WWPN_BYTES = re.compile(rb'(?:[0-9a-fA-F]{2}:){7}[0-9a-fA-F]{2}')
+# 用於匹配 zoneshow 中的 alias 名稱，以及其後第一個含有 WWPN 的行中的 WWPN。
+# 中間可以隔著不含 WWPN 的行，但遇到下一個 alias: 行時即改由該 alias 取得 WWPN
+_ALIAS_BYTES_RE = re.compile(rb'^[ \t]*alias:[ \t]*(\S[^\r\n]*?)[ \t]*\r?\n'
+                             rb'(?:(?![ \t]*alias:)[^\n]*\n)*?(?![ \t]*alias:)[^\n]*?(' + _WWPN_BYTES.pattern + rb')', re.M)
+# 用於匹配 zoneshow 中的 zone 名稱，以及其後第一個非空白行的成員
+_ZONE_BYTES_RE = re.compile(rb'^[ \t]*zone:[ \t]*(\S[^\r\n]*?)[ \t]*\r?\n\s*(?!(?:alias|zone|cfg):)(\S[^\r\n]*)', re.M)
+# 用於匹配 switchshow 中 Online 的 F-Port 資料行，一次取出同一行中的 Port Index 與 WWPN
+_SWITCHSHOW_BYTES_RE = re.compile(rb'^[ \t]*(\d+)[ \t]+(?=.*F-Port)(?=.*Online).*?(' + _WWPN_BYTES.pattern + rb')', re.M)
+
+def _decode_name(raw: bytes) -> str:
+    """
+    將 alias 或 zone 名稱以 UTF-8 解碼，無法解碼的位元組以替代字元表示，不會中斷解析。
+
+    Args:
+        raw (bytes): 從 TXT 檔案中取出的名稱位元組。
+
+    Returns:
+        str: 解碼後的名稱。
+    """
+    return raw.decode('utf-8', errors='replace')
+
+def parse_txt(file_path: str) -> tuple[dict[str, str], dict[str, str], list[PortRow] | None]:
+    """
+    單次讀取 zoneshow 與 switchshow 的文字輸出，同時解析既有 alias、zone 與連接埠資料。
+
+    Args:
+        file_path (str): 包含 'zoneshow' 與 'switchshow' 輸出的文字檔案路徑。
+
+    Returns:
+        tuple[dict[str, str], dict[str, str], list[PortRow] | None]:
+            WWPN 到 alias 名稱的對應字典、alias 到 zone 名稱的對應字典，
+            以及連接埠資料的 PortRow 列表 (如果發生錯誤或找不到資料則為 None)。
+    """
+    alias_map: dict[str, str] = {}
+    alias_to_zone_map: dict[str, str] = {}
+    # switchshow 的 Port Index 與 WWPN 以平行的列表收集，待整個檔案解析完畢後再批次對應 alias 與 zone
+    port_indices: list[str] = []
+    wwpns: list[str] = []
+
+    # 只有開啟檔案與建立 mmap 可能失敗，解析本身放在 try 之外
+    try:
+        # zoneshow/switchshow 的輸出皆為 ASCII，以 mmap 直接掃描位元組，省去逐行解碼
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return alias_map, alias_to_zone_map, None
+            # mmap 會自行保留檔案的參照，關閉 f 後仍可使用
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        print(f"錯誤：找不到檔案 '{file_path}'", file=sys.stderr)
+        return alias_map, alias_to_zone_map, None
+    except OSError as e:
+        print(f"讀取 TXT 檔案時發生錯誤：{e}", file=sys.stderr)
+        return alias_map, alias_to_zone_map, None
+
+    with mm:
+        # alias 名稱與其後第一個含有 WWPN 的行中的 WWPN
+        for match in _ALIAS_BYTES_RE.finditer(mm):
+            alias_map[match.group(2).decode('ascii').lower()] = _decode_name(match.group(1))
+
+        # zone 只從 Defined configuration 區塊開始解析
+        defined_start = mm.find(b'Defined configuration:')
+        if defined_start != -1:
+            for match in _ZONE_BYTES_RE.finditer(mm, defined_start):
+                zone_name = _decode_name(match.group(1))
+                for member in match.group(2).split(b';'):
+                    member_alias = member.strip()
+                    if member_alias:
+                        alias_to_zone_map[_decode_name(member_alias)] = zone_name
+
+        # 找到 switchshow 輸出的標頭，從下一行開始解析
+        header_start = mm.find(b'Index Port Address')
+        if header_start != -1:
+            start = mm.find(b'\n', header_start) + 1 or len(mm)
+            # 下一個命令提示符所在的行即為 switchshow 區塊的結尾，只需尋找一次
+            end = mm.find(b'admin>', start)
+            end = len(mm) if end == -1 else mm.rfind(b'\n', start, end) + 1 or start
+            _add_index = port_indices.append
+            _add_wwpn = wwpns.append
+            # 尋找以 Port Index 開頭、包含 WWPN 且為 Online 'F-Port' 的行
+            for match in _SWITCHSHOW_BYTES_RE.finditer(mm, start, end):
+                _add_index(match.group(1).decode('ascii'))
+                # WWPN 已由正規表示式驗證格式，正規化只需轉為小寫
+                # (逐一呼叫 str.lower 比轉成 Arrow 陣列計算再轉回列表更快，也不需要去除空白)
+                _add_wwpn(match.group(2).decode('ascii').lower())
+
+    if not port_indices:
+        return alias_map, alias_to_zone_map, None
+
+    # 檢查此 WWPN 是否已有別名，若無則使用預設名稱。
+    # 只有在找不到別名時才組出預設名稱，避免每個連接埠都建立一次用不到的字串
+    # (解析出的 alias 名稱不會是空字串，因此可用 or 判斷)
+    _get_alias = alias_map.get
+    aliases = [_get_alias(wwpn) or f"Port_{port_index}" for wwpn, port_index in zip(wwpns, port_indices)]
+    # 檢查此 alias 是否屬於某個 zone，如果找不到則為空
+    _get_zone = alias_to_zone_map.get
+    zones = [_get_zone(alias_name, '') for alias_name in aliases]
+
+    rows = list(map(PortRow, port_indices, aliases, wwpns, zones))
+    return alias_map, alias_to_zone_map, rows